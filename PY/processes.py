@@ -6,11 +6,168 @@ This module contains the process definitions and calculates D-values for
 intra-region processes of a particular model parametrization'''
 ################################################################################
 
-from numpy import *
-import inspect
-import copy
+from numpy import array, zeros, where, minimum, maximum, log10, exp, sqrt, \
+     pi, reciprocal, errstate, multiply, divide, empty, copyto
 from globalz import *
-import sys
+try:
+    from numba import njit, prange
+    _HAS_NUMBA=True
+except ImportError:
+    _HAS_NUMBA=False
+try:
+    import numexpr
+    _HAS_NUMEXPR=True
+except ImportError:
+    _HAS_NUMEXPR=False
+
+## values of yes/no switches in the control file, compared in lower case
+_TRUTHY=frozenset(['1','true','t','yes','y'])
+_FALSY=frozenset(['0','false','f','no','n'])
+
+## D-values corrected by betr_intermittent_rain, as (wet particle, rain
+## dissolution) pairs of air-veg, air-freshwater, air-ocean and air-soil
+_RAIN_KEYS=((2,3,'betr_air2_veg_wetparticle'),
+            (2,3,'betr_air2_veg_dissolution'),
+            (2,4,'betr_air2_freshwater_wetparticle'),
+            (2,4,'betr_air2_freshwater_dissolution'),
+            (2,5,'betr_air2_ocean_wetparticle'),
+            (2,5,'betr_air2_ocean_dissolution'),
+            (2,6,'betr_air2_soil_wetparticle'),
+            (2,6,'betr_air2_soil_dissolution'))
+
+def _switch(value, values):
+    ''' True if the control file entry *value* is one of *values* '''
+    return(str(value).strip().lower() in values)
+
+## numerical kernels ###########################################################
+def _harm(a, b):
+    ''' serial connection (1/a+1/b)**-1 of two D-values '''
+    if _HAS_NUMEXPR:
+        return(numexpr.evaluate('1/(1/a+1/b)'))
+    d=reciprocal(a)
+    d+=reciprocal(b)
+    return(reciprocal(d, out=d))
+
+def _plowing_soildiff(A, h, da, dw, cs, za, zw, zs, tspe):
+    ''' air-soil diffusion D-value with plowing enhancement, with
+    *tspe* the time since the last plowing event'''
+    if _HAS_NUMEXPR:
+        return(numexpr.evaluate('A*sqrt(h)*(sqrt(da)*za+sqrt(dw)*zw'
+                                '+sqrt(cs)*zs)/sqrt(pi*tspe)',
+                                local_dict={'A':A, 'h':h, 'da':da, 'dw':dw,
+                                            'cs':cs, 'za':za, 'zw':zw,
+                                            'zs':zs, 'tspe':tspe, 'pi':pi}))
+    return(A*sqrt(h)*(sqrt(da)*za+sqrt(dw)*zw+sqrt(cs)*zs)/sqrt(pi*tspe))
+
+if _HAS_NUMBA:
+    @njit(parallel=True, cache=True, error_model='numpy')
+    def _harmonic_where(guard, a, b):
+        ''' serial connection (1/a+1/b)**-1 of two D-values, evaluated
+        only where guard > 0, zero elsewhere.'''
+        d=zeros(a.shape)
+        for i in prange(a.shape[0]):
+            for j in range(a.shape[1]):
+                if guard[i,j] > 0:
+                    d[i,j]=1.0/(1.0/a[i,j]+1.0/b[i,j])
+        return(d)
+else:
+    def _harmonic_where(guard, a, b):
+        ''' serial connection (1/a+1/b)**-1 of two D-values, evaluated
+        only where guard > 0, zero elsewhere.'''
+        with errstate(divide='ignore', invalid='ignore'):
+            return(where(guard > 0, _harm(a, b), 0.0))
+
+def _rain_mask(tdry, twet, dwet, ddiss):
+    ''' cells with dry and wet periods and with wet particle and rain
+    dissolution D-values, i.e. where the intermittent rain correction
+    applies'''
+    if _HAS_NUMEXPR:
+        return(numexpr.evaluate('(tdry!=0)&(twet!=0)&(dwet!=0)&(ddiss!=0)'))
+    mask=tdry != 0
+    mask&=twet != 0
+    # not in place, dwet may have a leading axis of stacked sections
+    mask=mask & (dwet != 0)
+    mask&=ddiss != 0
+    return(mask)
+
+def _jolliet(wa, dwet, ddiss, twet, tdry):
+    ''' Jolliet-Hauschild correction of the wet particle and rain
+    dissolution D-values for intermittent rain, with *tdry* and *twet*
+    the durations of the dry and wet periods; returns the new
+    [dwet, ddiss].'''
+    tsum=tdry+twet
+    dj1=wa*tsum/tdry
+    dj2=(dwet+ddiss)*twet/tsum
+    dj1mask=dj1 > dj2
+    ddissnew=where(dj1mask, ddiss, dj1*ddiss/dj2)*twet/tsum
+    dwetnew=where(dj1mask, dwet, dj1*dwet/dj2)*twet/tsum
+    return([dwetnew,ddissnew])
+
+if _HAS_NUMBA:
+    ## explicit signatures; the 2-d arrays may be strided views of the
+    ## structured model.par
+    _CELL_SIGS=['UniTuple(f8, 2)(f8, f8, f8, f8, f8)']
+    _SECTIONS_SIGS=['void(%s)' % ', '.join(['f8[:,:]']*15)]
+
+    @njit(_CELL_SIGS, cache=True, nogil=True, error_model='numpy')
+    def _jolliet_cell(wa, dwet, ddiss, twet, tdry):
+        ''' :py:func:`_jolliet` for a single cell '''
+        tsum=tdry+twet
+        dj1=wa*tsum/tdry
+        dj2=(dwet+ddiss)*twet/tsum
+        if dj1 > dj2:
+            return(dwet*twet/tsum, ddiss*twet/tsum)
+        return(dj1*dwet/dj2*twet/tsum, dj1*ddiss/dj2*twet/tsum)
+
+    @njit(_SECTIONS_SIGS, parallel=True, cache=True, nogil=True,
+          error_model='numpy')
+    def _jolliet_sections(stdry, stwet, vz2, p3i, perc4, perc5, perc6,
+                          dwetveg, ddissveg, dwetfw, ddissfw, dwetocean,
+                          ddissocean, dwetsoil, ddisssoil):
+        ''' intermittent rain correction of the air-veg, air-freshwater,
+        air-ocean and air-soil D-values in one pass over the grid, with
+        vz2=2*vbulk*zbulk of air and p3i=perc3*intercept. The D-value
+        arrays are updated in place.'''
+        for i in prange(stdry.shape[0]):
+            for j in range(stdry.shape[1]):
+                tdry=stdry[i,j]
+                twet=stwet[i,j]
+                if tdry == 0 or twet == 0:
+                    continue
+                vz=vz2[i,j]
+                if dwetveg[i,j] != 0 and ddissveg[i,j] != 0:
+                    wa=vz/tdry*perc6[i,j]*p3i[i,j]
+                    dwetveg[i,j], ddissveg[i,j]=_jolliet_cell(
+                        wa, dwetveg[i,j], ddissveg[i,j], twet, tdry)
+                if dwetfw[i,j] != 0 and ddissfw[i,j] != 0:
+                    wa=vz/tdry*perc4[i,j]
+                    dwetfw[i,j], ddissfw[i,j]=_jolliet_cell(
+                        wa, dwetfw[i,j], ddissfw[i,j], twet, tdry)
+                if dwetocean[i,j] != 0 and ddissocean[i,j] != 0:
+                    wa=vz/tdry*perc5[i,j]
+                    dwetocean[i,j], ddissocean[i,j]=_jolliet_cell(
+                        wa, dwetocean[i,j], ddissocean[i,j], twet, tdry)
+                if dwetsoil[i,j] != 0 and ddisssoil[i,j] != 0:
+                    wa=vz/tdry*perc6[i,j]
+                    dwetsoil[i,j], ddisssoil[i,j]=_jolliet_cell(
+                        wa, dwetsoil[i,j], ddisssoil[i,j], twet, tdry)
+################################################################################
+
+def _memoize(cache):
+    ''' decorator turning a method into a property whose value is
+    calculated on first use and then kept in the dictionary
+    attribute *cache* of the instance'''
+    def decorate(f):
+        name=f.__name__
+        def get(self):
+            d=getattr(self,cache)
+            try:
+                return(d[name])
+            except KeyError:
+                d[name]=f(self)
+                return(d[name])
+        return(property(get, doc=f.__doc__))
+    return(decorate)
 
 class process():
     ''' The class contains the intra-region process descriptions of
@@ -26,58 +183,258 @@ class process():
     implemented. The class provides the method
     :py:meth:`~processes.process.getD` that calls all process
     description methods and returns a dictionary containing *all*
-    process D-values'''
+    process D-values.
+
+    The D-values returned by getD belong to the process object and are
+    read-only for the caller: the D-values of processes that vanish for
+    the parametrization are all the same non-writeable array of zeros,
+    and several processes write into buffers that are reused by the
+    next call of getD. Copy a D-value before modifying it or keeping it
+    across calls.'''
     
     def __init__(self, model):
         self.m=model
         self.D={}
+        self._bufs={}
+        self._mtc_event_cache=None
+        self._rain_cache=None
+        self._wetparticle_cache=None
+        self._area_cache={}
+        self._switch_cache={}
+        self._rainbuf=None
         ## calculation of D-values##
         ## check whether all processes are implemented
         self.plist=[x[0] for x in self.m.proclist]
         for p in self.plist:
-            try:
-                getattr(self,p)
-            except AttributeError:
-                print("processes.py: "
-                      +"Method %s not implemented !\n Aborting!") % (p)
-                sys.exit(1)
+            if not hasattr(self,p):
+                raise NotImplementedError("processes.py: "
+                                          +"Method %s not implemented !" % (p))
+        ## chemical properties that do not change during a model run
+        cpdict=self.m.chempardict
+        if 'betr_degradation' in self.plist:
+            # rate constants, volumes and Z-values of all compartments
+            # stacked along the first axis
+            self._degcomps=list(self.m.compdict.keys())
+            zdeg=[]
+            for c in self._degcomps:
+                # degradation in air only in gas phase ?
+                if c in (1,2) and not self._aerosol_deg:
+                    zdeg.append(self.m.zdict[c]['air'])
+                else:
+                    zdeg.append(self.m.zdict[c]['bulk'])
+            self._kreac_stack=array([cpdict[c]['k_reac']
+                                     for c in self._degcomps])
+            self._vbulk_stack=array([self.m.vdict[c]['bulk']
+                                     for c in self._degcomps])
+            self._zdeg_stack=array(zdeg)
+        if 'betr_air2_veg_diff' in self.plist:
+            # vegetation-side (cuticle) mass transfer coefficient
+            # (Cousins and Mackay, 2001)
+            logKow=log10(cpdict[2]['Kow'])
+            logpc=(-3.47-2.79*log10(self.m.chemdict['molmass'])\
+                    +0.97*logKow-11.2+0.704*logKow) / 2
+            self._mtcavv=3600*10**logpc/cpdict[2]['Kaw']
+        if 'betr_soil_veg_rootuptake' in self.plist:
+            # transpiration stream concentration factor
+            self._TSCF=0.784*exp(-((log10(cpdict[6]['Kow'])-1.78)**2)/2.44)
+        if 'betr_intermittent_rain' in self.plist:
+            # surface fractions perc3 to perc6 stacked along the first axis
+            self._percstack=array([self.m.par['perc%d' % c]
+                                   for c in (3,4,5,6)])
+        ## rows of intra-cell flows in the flow tables, their region
+        ## indices and a buffer for the flows [m^3/h]; the flow
+        ## topology does not change during a model run
+        self._intracell={}
+        for (p,k) in [('betr_freshwater_ocean_runoff',(4,5)),
+                      ('betr_ocean_sinkflux',(5,5))]:
+            if p in self.plist:
+                flow=self.m.flowdict[k]
+                rows=where(flow[:,0]==flow[:,1])[0]
+                regidx=flow[rows,0].astype('int')-1
+                self._intracell[k]=(rows, regidx, zeros(self.m.par.shape))
+        ## processes whose D-values vanish for this parametrization are
+        ## evaluated only once; all their D-values share one read-only
+        ## array of zeros
+        self._zero=zeros(self.m.par.shape)
+        self._zero.flags.writeable=False
+        self._zeroprocs=[p for p in self.plist if self._is_trivially_zero(p)]
+        self.plist_active=[p for p in self.plist if p not in self._zeroprocs]
+        self._proc_funcs=[getattr(self,p) for p in self.plist_active]
+        self._Dzero=None
+
+    ## switches of the control file. Each is read on first use, so the
+    ## control file needs only the entries of the processes in the list.
+    @_memoize('_switch_cache')
+    def _suppress_secondary(self):
+        ''' suppress secondary re-emission from surface compartments ?'''
+        return(_switch(self.m.controldict['secondarySupr'], _TRUTHY))
+
+    @_memoize('_switch_cache')
+    def _aerosol_deg(self):
+        ''' degradation in air also in the aerosol phase ?'''
+        return(not _switch(self.m.controldict['aerosoldeg'], _FALSY))
+
+    @_memoize('_switch_cache')
+    def _plowing_enhance(self):
+        ''' plowing enhancement of air-soil diffusion ?'''
+        return(_switch(self.m.controldict['plowingEnhance'], _TRUTHY))
 
     def getD(self):
-        ''' construct dictionary with D-values for all intra-cell processes '''
+        ''' construct dictionary with D-values for all intra-cell processes.
+        The D-values of each process enter self.D as soon as they are
+        calculated, since later processes (betr_intermittent_rain) read
+        and correct D-values of earlier ones.'''
         
-        for p in self.plist:
-            self.D.update(getattr(self,p)())
-        return(self.D)
+        self._mtc_event_cache=None
+        self._rain_cache=None
+        self._wetparticle_cache=None
+        self._area_cache={}
+        D=self.D
+        if self._Dzero is None:
+            self._Dzero={}
+            for p in self._zeroprocs:
+                for k in getattr(self,p)():
+                    self._Dzero[k]=self._zero
+        D.update(self._Dzero)
+        update=D.update
+        for f in self._proc_funcs:
+            update(f())
+        return(D)
+
+    def _is_trivially_zero(self, p):
+        ''' True if all D-values of process p are zero for this model
+        parametrization, irrespective of the chemical.'''
+        if p in ('betr_ocean_air_resusp', 'betr_soil_air_resusp'):
+            return(self._suppress_secondary)
+        if p in ('betr_air2_veg_diff', 'betr_air2_veg_drydep',
+                 'betr_air2_veg_dissolution', 'betr_air2_veg_wetparticle',
+                 'betr_soil_veg_rootuptake'):
+            # no vegetation anywhere
+            return(not self.m.par['perc3'].any())
+        return(False)
+
+    def _mtc_event(self):
+        ''' rain rate during precipitation events, shared by all
+        dissolution and wet particle deposition processes. It is
+        calculated once per call of :py:meth:`getD`.'''
+        if self._mtc_event_cache is None:
+            par=self.m.par
+            stwet=par['stwet']
+            # deal here with stwet == 0, and inconsistencies in the
+            # BETR Global paramterisation, where stwet=0 but precip > 0
+            norainmask = stwet == 0
+            stwet_safe=where(norainmask, 1.0, stwet)
+            self._mtc_event_cache=where(norainmask, 0.0,
+                                        par['precip']*(par['stdry']+stwet)
+                                        /stwet_safe)
+        return(self._mtc_event_cache)
+
+    def _prod(self, key, *factors):
+        ''' product of *factors*. The result is kept in self._bufs[key]
+        and overwritten in place by later calls with the same key, so
+        that repeated calls of :py:meth:`getD` do not allocate new
+        D-value arrays.'''
+        out=self._bufs.get(key)
+        if out is None:
+            out=self._bufs[key]=factors[0]*factors[1]
+        else:
+            multiply(factors[0], factors[1], out=out)
+        for f in factors[2:]:
+            multiply(out, f, out=out)
+        return(out)
+
+    def _intracell_flow(self, k):
+        ''' flows from compartment k[0] to k[1] within the same region,
+        taken from the flow table self.m.flowdict[k]. Returns an array
+        of the shape of self.m.par that is reused by subsequent calls.'''
+        rows, regidx, mflow=self._intracell[k]
+        mflow.fill(0)
+        mflow[regidx,:]=self.m.flowdict[k][rows,2:]
+        return(mflow)
+
+    def _rain_dissolution(self, c, procname, A):
+        ''' D-value of rain dissolution from lower air to compartment c,
+        which receives rain on the surface A [m^2]'''
+        if self._rain_cache is None:
+            self._rain_cache=self._mtc_event()*self.m.zdict[2]['rain']
+        key=(2,c,procname)
+        return({key:self._prod(key, A, self._rain_cache)})
+
+    def _wet_particle(self, c, procname, A):
+        ''' D-value of wet particle deposition from lower air to
+        compartment c, which receives rain on the surface A [m^2]'''
+        if self._wetparticle_cache is None:
+            par=self.m.par
+            self._wetparticle_cache=self._mtc_event()\
+                *self.m.zdict[2]['aerosol']*par['fp2']*par['scavrat']
+        key=(2,c,procname)
+        return({key:self._prod(key, A, self._wetparticle_cache)})
+
+    ## compartment surface areas shared by most processes. Each is
+    ## calculated on first use within a call of getD, so that only the
+    ## parameters of the processes in the list are read.
+    @_memoize('_area_cache')
+    def _Ap4(self):
+        ''' freshwater surface area '''
+        return(self.m.par['A']*self.m.par['perc4'])
+
+    @_memoize('_area_cache')
+    def _Ap5(self):
+        ''' ocean surface area '''
+        return(self.m.par['A']*self.m.par['perc5'])
+
+    @_memoize('_area_cache')
+    def _Ap6(self):
+        ''' soil surface area '''
+        return(self.m.par['A']*self.m.par['perc6'])
+
+    @_memoize('_area_cache')
+    def _Ap6p3(self):
+        ''' vegetated soil surface area '''
+        return(self._Ap6*self.m.par['perc3'])
+
+    @_memoize('_area_cache')
+    def _Ap6p3LAI(self):
+        ''' leaf area '''
+        return(self._Ap6p3*self.m.par['LAI'])
+
+    @_memoize('_area_cache')
+    def _haslid(self):
+        ''' True if the pot-lid fraction *perc8* is a model parameter
+        (SSchenker backward compatibility)'''
+        return('perc8' in self.m.par.dtype.names)
+
+    @_memoize('_area_cache')
+    def _Ap5lid(self):
+        ''' ocean surface area, including the pot-lid factor (1-perc8)
+        if *perc8* is a model parameter'''
+        if self._haslid:
+            return(self._Ap5*(1-self.m.par['perc8']))
+        return(self._Ap5)
  
     def betr_degradation(self):
         ''' degradation '''
         # don't change this
         D={}
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        for c in self.m.compdict.keys():
-            D[(c,c,procname)]=self.m.chempardict[c]['k_reac']\
-                                 *self.m.vdict[c]['bulk']\
-                                 *self.m.zdict[c]['bulk']
-        # degradation in air only in gas phase ?
-        if self.m.controldict['aerosoldeg'] in ['0','False','false','f','FALSE'
-                                                'F','No','no','n','NO']:
-            D[(1,1,procname)]=self.m.chempardict[1]['k_reac']\
-                                   *self.m.vdict[1]['bulk']\
-                                   *self.m.zdict[1]['air']
-            D[(2,2,procname)]=self.m.chempardict[2]['k_reac']\
-                                   *self.m.vdict[2]['bulk']\
-                                   *self.m.zdict[2]['air']
+        procname='betr_degradation'
+        # all compartments in one go, see __init__
+        Ddeg=self._prod(procname, self._kreac_stack, self._vbulk_stack,
+                        self._zdeg_stack)
+        for i, c in enumerate(self._degcomps):
+            D[(c,c,procname)]=Ddeg[i]
         return(D)
      
     def betr_advectiveloss(self):
         ''' advective loss from the system '''
         # don't change this
         D={}
+        par=self.m.par
+        zdict=self.m.zdict
+        A6=self._Ap6
         ## soil convection
         ## ATT: what is factor 0.05 ? Correction for vert. conc. profile ?
-        D[(6,6,'burial')]=0.05*self.m.par['convec6solids']\
-                               *self.m.par['A']*self.m.par['perc6']\
-                               *self.m.zdict[6]['solids']
+        D[(6,6,'burial')]=self._prod((6,6,'burial'), 0.05*par['convec6solids'],
+                                     A6, zdict[6]['solids'])
         ### leaching from soil (loss from system)
         #D[(6,6,'leach')]=self.m.par['leach6']\
                               #*self.m.par['A']*self.m.par['perc6']\
@@ -85,40 +442,43 @@ class process():
         ## leaching from soil (loss from system)
         # Modified by HW: leach6 = prec - runoff
         # To be improved: leach6 = prec - runoff - evaporation - dsnow
-        D[(6,6,'leach')]=(self.m.par['precip']-self.m.par['runoff6water'])\
-                              *self.m.par['A']*self.m.par['perc6']\
-                              *self.m.zdict[6]['water']
+        D[(6,6,'leach')]=self._prod((6,6,'leach'),
+                                    par['precip']-par['runoff6water'], A6,
+                                    zdict[6]['water'])
         ## sediment burial
         #SSchenker This should be equal to the sedimentation - resusp rate
 #        D[(7,7,'burial')]=self.m.par['A']*self.m.par['perc4']\
 #                               *self.m.par['seddep']*self.m.zdict[4]['sussed']
 #       Change not accepted
 #       
-        D[(7,7,'burial')]=self.m.par['sedburial']\
-                               *self.m.par['A']*self.m.par['perc4']\
-                               *self.m.zdict[7]['solids']
+        D[(7,7,'burial')]=self._prod((7,7,'burial'), par['sedburial'],
+                                     self._Ap4, zdict[7]['solids'])
         ## diffusion to stratosphere
-        D[(1,1,'stratosphere')]=self.m.par['diffstrato']*self.m.par['A']\
-                                     *self.m.zdict[1]['air']
+        D[(1,1,'stratosphere')]=self._prod((1,1,'stratosphere'),
+                                           par['diffstrato'], par['A'],
+                                           zdict[1]['air'])
         ## sedimentation in ocean
-        D[(5,5,'sedimentation')]=self.m.par['partsink5']\
-                                      *self.m.par['A']*self.m.par['perc5']\
-                                      *self.m.zdict[5]['sussed']
+        D[(5,5,'sedimentation')]=self._prod((5,5,'sedimentation'),
+                                            par['partsink5'], self._Ap5,
+                                            zdict[5]['sussed'])
         return(D)
 
     def betr_air1_air2_mix(self):
         ''' mixing between upper and lower atmosphere '''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air1_air2_mix'
         D={}
-        D[(1,2,procname)]=self.m.par['A']*self.m.par['mixing12']\
-                           *self.m.zdict[1]['bulk']
+        par=self.m.par
+        A=par['A']
+        D[(1,2,procname)]=self._prod((1,2,procname), A, par['mixing12'],
+                                     self.m.zdict[1]['bulk'])
+        z2b=self.m.zdict[2]['bulk']
         try: 
-            D[(2,1,procname)]=self.m.par['A']*self.m.par['mixing21']\
-                           *self.m.zdict[2]['bulk']
+            D[(2,1,procname)]=self._prod((2,1,procname), A, par['mixing21'],
+                                         z2b)
         except  ValueError: # SSchenker backward compatibility
-            D[(2,1,procname)]=self.m.par['A']*self.m.par['mixing12']\
-                           *self.m.zdict[2]['bulk'] 
+            D[(2,1,procname)]=self._prod((2,1,procname), A, par['mixing12'],
+                                         z2b)
         # 'mixing 21' added by HW in February 2013
         # by default the same as 'mixing12' and in const_parameters 
         # option to define in seasonal_parameters, using omega
@@ -129,31 +489,24 @@ class process():
         ''' diffusive air-vegetation exchange according to
         Cousins and Mackay, 2001 [1]_.'''
         #don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_veg_diff'
         D={}
         # process description starts here
-        logpc=(-3.47-2.79*log10(self.m.chemdict['molmass'])\
-                +0.97*log10(self.m.chempardict[2]['Kow'])\
-                -11.2+0.704*log10(self.m.chempardict[2]['Kow'])
-               ) / 2
-        pc=10**logpc
-        mtcavv=3600*pc/self.m.chempardict[2]['Kaw']
-        A=self.m.par['A']*self.m.par['perc6']*self.m.par['perc3']\
-           *self.m.par['LAI']
-        Apos=where(A>0) # prevent division by zero errors
-        d=zeros(A.shape)
-        dc=A*mtcavv*self.m.zdict[3]['bulk']
-        da=A*self.m.par['mtcairvegair']*self.m.zdict[2]['air']
-        d[Apos]=(1/dc[Apos]+1/da[Apos])**-1
+        par=self.m.par
+        z3b=self.m.zdict[3]['bulk']
+        z2a=self.m.zdict[2]['air']
+        A=self._Ap6p3LAI
+        dc=A*self._mtcavv*z3b
+        da=A*par['mtcairvegair']*z2a
+        d=_harmonic_where(A, dc, da) # prevent division by zero errors
         # ATT : speed-limit to diffusion to a char. time > 8h
         # ATT : not clear to me, why veg->air, not air->veg
         # ATT : or both ?
-        d=minimum(d,self.m.zdict[3]['bulk']*self.m.vdict[3]['bulk']/8.0)
+        d=minimum(d,z3b*self.m.vdict[3]['bulk']/8.0)
         D[(2,3,procname)]=d
         # suppress secondary re-emission from surface compartments ? (non-default)
-        if self.m.controldict['secondarySupr'] in ['1','True','true','t','TRUE'
-                                                'T','Yes','yes','y','YES']:
-            D[(3,2,procname)]=zeros(self.m.par['A'].shape)
+        if self._suppress_secondary:
+            D[(3,2,procname)]=self._zero
         else:
             D[(3,2,procname)]=d     
         return(D)
@@ -161,72 +514,47 @@ class process():
     def betr_air2_veg_drydep(self):
         '''dry deposition to vegetation'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_veg_drydep'
         D={}
         # process description starts here
-        A=self.m.par['A']*self.m.par['perc6']*self.m.par['perc3']
-        D[(2,3,procname)]=A*self.m.par['fp2']*self.m.par['mtcaerosol']\
-                         *self.m.zdict[2]['aerosol']
+        par=self.m.par
+        D[(2,3,procname)]=self._prod((2,3,procname), self._Ap6p3, par['fp2'],
+                                     par['mtcaerosol'],
+                                     self.m.zdict[2]['aerosol'])
         return(D)
 
     def betr_air2_veg_dissolution(self):
         ''' air-vegetation rain dissolution (*the returned D-value
         refers to rain intensity during event (stwet)*)'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        procname='betr_air2_veg_dissolution'
         # process description starts here
-        A=self.m.par['A']*self.m.par['perc6']*self.m.par['perc3']
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0
-        D[(2,3,procname)]=A*mtc_event*self.m.zdict[2]['rain']\
-                           *self.m.par['intercept']
-        return(D)
-    
+        return(self._rain_dissolution(3, procname,
+                                      self._Ap6p3*self.m.par['intercept']))
+
     def betr_air2_veg_wetparticle(self):
         ''' wet particle deposition to vegetation
         (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        # don't change this
+        procname='betr_air2_veg_wetparticle'
         # process description starts here
-        A=self.m.par['A']*self.m.par['perc6']*self.m.par['perc3']
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0
-        D[(2,3,procname)]=A*mtc_event*self.m.zdict[2]['aerosol']\
-                       *self.m.par['scavrat']*self.m.par['fp2']\
-                       *self.m.par['intercept']
-        return(D)
+        return(self._wet_particle(3, procname,
+                                  self._Ap6p3*self.m.par['intercept']))
 
     def betr_air2_freshwater_diff(self):
         '''diffusive exchange air-freshwater'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_freshwater_diff'
         D={}
         # process description starts here
+        par=self.m.par
+        z4=self.m.zdict[4]
         # HW changed self.m.zdict[2]['air'] to self.m.zdict[4]['air']
-        D[(2,4,procname)]=self.m.par['A']*self.m.par['perc4']\
-                        *((self.m.par['mtc4air']*self.m.zdict[4]['air'])**-1\
-                          +(self.m.par['mtc4water']\
-                            *self.m.zdict[4]['water'])**-1)**-1
+        D[(2,4,procname)]=self._Ap4*_harm(par['mtc4air']*z4['air'],
+                                          par['mtc4water']*z4['water'])
         # suppress secondary re-emission from surface compartments ? (non-default)
-        if self.m.controldict['secondarySupr'] in ['1','True','true','t','TRUE'
-                                                'T','Yes','yes','y','YES']:
-            D[(4,2,procname)]=zeros(self.m.par['A'].shape)
+        if self._suppress_secondary:
+            D[(4,2,procname)]=self._zero
         else:
             D[(4,2,procname)]=D[(2,4,procname)]          
         return(D)
@@ -234,80 +562,53 @@ class process():
     def betr_air2_freshwater_drydep(self):
         ''' dry particle deposition to fresh water'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_freshwater_drydep'
         D={}
         # process description starts here
-        D[(2,4,procname)]=self.m.par['A']*self.m.par['perc4']\
-                        *self.m.par['fp2']*self.m.par['mtcaerosol']\
-                        *self.m.zdict[2]['aerosol']
+        par=self.m.par
+        D[(2,4,procname)]=self._prod((2,4,procname), self._Ap4, par['fp2'],
+                                     par['mtcaerosol'],
+                                     self.m.zdict[2]['aerosol'])
         return(D)
 
     def betr_air2_freshwater_dissolution(self):
         '''air-freshwater rain dissolution
          (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        # don't change this
+        procname='betr_air2_freshwater_dissolution'
         # process description starts here
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0
-        D[(2,4,procname)]=self.m.par['A']*self.m.par['perc4']\
-                           *mtc_event*self.m.zdict[2]['rain']
-        return(D)
+        return(self._rain_dissolution(4, procname, self._Ap4))
 
     def betr_air2_freshwater_wetparticle(self):
         '''air-freshwater wet particle deposition
         (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        # don't change this
+        procname='betr_air2_freshwater_wetparticle'
         # process description starts here
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0
-        D[(2,4,procname)]=self.m.par['A']*self.m.par['perc4']*mtc_event\
-                        *self.m.zdict[2]['aerosol']*self.m.par['fp2']\
-                        *self.m.par['scavrat']
-        return(D)
+        return(self._wet_particle(4, procname, self._Ap4))
 
     def betr_air2_ocean_diff(self):
         '''diffusive exchange air-ocean water'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_ocean_diff'
         D={}
         # process description starts here                                       
+        par=self.m.par
+        zdict=self.m.zdict
         # HW added 'perc8'. Simple pot-lid assumption.
         # HW changed self.m.zdict[2]['air'] to self.m.zdict[5]['air']
-        try: #Backward compatibility
-            D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']*\
-                        (1-self.m.par['perc8'])\
-                        *((self.m.par['mtc25air']*self.m.zdict[5]['air'])**-1\
-                        +(self.m.par['mtc25water']\
-                        *self.m.zdict[5]['water'])**-1)**-1
-        
-        except     ValueError:
-             D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']\
-                        *((self.m.par['mtc25air']*self.m.zdict[2]['air'])**-1\
-                          +(self.m.par['mtc25water']\
-                            *self.m.zdict[5]['water'])**-1)**-1
+        if self._haslid:
+            D[(2,5,procname)]=self._Ap5lid\
+                        *_harm(par['mtc25air']*zdict[5]['air'],
+                               par['mtc25water']*zdict[5]['water'])
+        else: #Backward compatibility
+             D[(2,5,procname)]=self._Ap5\
+                        *_harm(par['mtc25air']*zdict[2]['air'],
+                               par['mtc25water']*zdict[5]['water'])
         
         # suppress secondary re-emission from surface compartments ? (non-default)
-        if self.m.controldict['secondarySupr'] in ['1','True','true','t','TRUE'
-                                                'T','Yes','yes','y','YES']:
-            D[(5,2,procname)]=zeros(self.m.par['A'].shape)
+        if self._suppress_secondary:
+            D[(5,2,procname)]=self._zero
         else:
             D[(5,2,procname)]=D[(2,5,procname)]
         return(D)
@@ -316,107 +617,63 @@ class process():
     def betr_air2_ocean_drydep(self):
         ''' dry particle deposition to ocean water'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_ocean_drydep'
         D={}
         # process description starts here                                       
+        par=self.m.par
         # HW added 'perc8'. Simple pot-lid assumption.
-        try: 
-            D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']*\
-                        (1-self.m.par['perc8'])\
-                        *self.m.par['fp2']*self.m.par['mtcaerosol']\
-                        *self.m.zdict[2]['aerosol']
-        except ValueError:
-            D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']\
-                        *self.m.par['fp2']*self.m.par['mtcaerosol']\
-                        *self.m.zdict[2]['aerosol']
+        D[(2,5,procname)]=self._prod((2,5,procname), self._Ap5lid, par['fp2'],
+                                     par['mtcaerosol'],
+                                     self.m.zdict[2]['aerosol'])
         return(D)
 
     def betr_air2_ocean_dissolution(self):
         '''air-ocean water rain dissolution
         (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
+        # don't change this
+        procname='betr_air2_ocean_dissolution'
+        # process description starts here
         # HW added 'perc8'. Simple pot-lid assumption.
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0                                                 
-        try : #SSchenker backward compatibility
-            D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']*\
-                            (1-self.m.par['perc8'])\
-                            *mtc_event*self.m.zdict[2]['rain']
-        except ValueError:
-            D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']\
-                           *mtc_event*self.m.zdict[2]['rain']
-        return(D)
+        return(self._rain_dissolution(5, procname, self._Ap5lid))
 
     def betr_air2_ocean_wetparticle(self):
         '''air-ocean water wet particle deposition
         (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        # don't change this
+        procname='betr_air2_ocean_wetparticle'
         # process description starts here
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
         # HW added 'perc8'. Simple pot-lid assumption.
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0                                                 
-        try: 
-            D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']*\
-                        (1-self.m.par['perc8'])*mtc_event\
-                        *self.m.zdict[2]['aerosol']*self.m.par['fp2']\
-                        *self.m.par['scavrat']
-        except ValueError:
-                D[(2,5,procname)]=self.m.par['A']*self.m.par['perc5']*mtc_event\
-                        *self.m.zdict[2]['aerosol']*self.m.par['fp2']\
-                        *self.m.par['scavrat']                        
-        return(D)
+        return(self._wet_particle(5, procname, self._Ap5lid))
     
     def betr_air2_soil_diff(self):
         '''diffusive exchange air-soil'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_soil_diff'
         D={}
         # process description starts here   
-        A6pos=where(self.m.par['perc6']>0)  # HW: prevent division by zero errors
-        d=zeros(self.m.par['A'].shape)
-        if self.m.controldict['plowingEnhance'] in ['1', 'True', 'true', 't', 'TRUE'
-                                                    'T', 'Yes', 'yes', 'y', 'YES']: 
+        par=self.m.par
+        z6=self.m.zdict[6]
+        A6=self._Ap6
+        if self._plowing_enhance:
             # HW: including plowing enhancement, according to 
             # self.m.zdict[2]['air'] changed to self.m.zdict[6]['air']
             # 'tspe' = time since last plowing event, see seasonal_parameters file
-            dsa=self.m.par['A']*self.m.par['perc6']*sqrt(self.m.par['h6'])\
-             *(sqrt(self.m.par['diff6air'])*self.m.zdict[6]['air']\
-             +sqrt(self.m.par['diff6water'])*self.m.zdict[6]['water']\
-             +sqrt(self.m.par['convec6solids'])*self.m.zdict[6]['solids'])\
-             /sqrt(pi*self.m.par['tspe'])
+            dsa=_plowing_soildiff(A6, par['h6'], par['diff6air'],
+                                  par['diff6water'], par['convec6solids'],
+                                  z6['air'], z6['water'], z6['solids'],
+                                  par['tspe'])
         else: # Old version without plowing enhancement
-            dsa=self.m.par['A']*self.m.par['perc6']\
-             *(self.m.par['diff6air']*self.m.zdict[6]['air']\
-             +self.m.par['diff6water']*self.m.zdict[6]['water']\
-             +self.m.par['convec6solids']*self.m.zdict[6]['solids'])
+            dsa=A6*(par['diff6air']*z6['air']\
+             +par['diff6water']*z6['water']\
+             +par['convec6solids']*z6['solids'])
              
-        das=self.m.par['A']*self.m.par['perc6']\
-             *self.m.par['mtc6air']*self.m.zdict[6]['air']
-        d[A6pos]=(1/dsa[A6pos] + 1/das[A6pos])**-1
-        D[(2,6,procname)]=d
+        das=A6*par['mtc6air']*z6['air']
+        # HW: prevent division by zero errors
+        D[(2,6,procname)]=_harmonic_where(par['perc6'], dsa, das)
         # D[(2,6,procname)]=(1/dsa + 1/das)**-1
         # suppress secondary re-emission from surface compartments ? (non-default)
-        if self.m.controldict['secondarySupr'] in ['1','True','true','t','TRUE'
-                                                'T','Yes','yes','y','YES']:
-            D[(6,2,procname)]=zeros(self.m.par['A'].shape)
+        if self._suppress_secondary:
+            D[(6,2,procname)]=self._zero
         else:
             D[(6,2,procname)]=D[(2,6,procname)]
         return(D)
@@ -425,59 +682,36 @@ class process():
     def betr_air2_soil_drydep(self):
         ''' dry particle deposition to soil'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_air2_soil_drydep'
         D={}
         # process description starts here
-        D[(2,6,procname)]=self.m.par['A']*self.m.par['perc6']\
-                        *self.m.par['fp2']*self.m.par['mtcaerosol']\
-                        *self.m.zdict[2]['aerosol']*(1-self.m.par['perc3'])
+        par=self.m.par
+        D[(2,6,procname)]=self._prod((2,6,procname), self._Ap6, par['fp2'],
+                                     par['mtcaerosol'],
+                                     self.m.zdict[2]['aerosol'],
+                                     1-par['perc3'])
         return(D)
 
     def betr_air2_soil_dissolution(self):
         '''air-soil rain dissolution
         (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        # don't change this
+        procname='betr_air2_soil_dissolution'
         # process description starts here
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0
-        D[(2,6,procname)]=self.m.par['A']*self.m.par['perc6']\
-                           *mtc_event*self.m.zdict[2]['rain']
-        return(D)
+        return(self._rain_dissolution(6, procname, self._Ap6))
 
     def betr_air2_soil_wetparticle(self):
         '''air-soil wet particle deposition
         (*the returned D-value refers to rain intensity during event (stwet)*)'''
-         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
-        D={}
+        # don't change this
+        procname='betr_air2_soil_wetparticle'
         # process description starts here
-        # rain rate during precipitation events
-        # deal here with stwet == 0, and inconsistencies in the
-        # BETR Global paramterisation, where stwet=0 but precip > 0
-        norainmask = self.m.par['stwet'] == 0
-        stwet_tmp=copy.copy(self.m.par['stwet'])
-        stwet_tmp[norainmask]=1
-        mtc_event=self.m.par['precip']\
-                   *(self.m.par['stdry']+self.m.par['stwet'])/stwet_tmp
-        mtc_event[norainmask]=0
-        D[(2,6,procname)]=self.m.par['A']*self.m.par['perc6']*mtc_event\
-                        *self.m.zdict[2]['aerosol']*self.m.par['fp2']\
-                        *self.m.par['scavrat']
-        return(D)
+        return(self._wet_particle(6, procname, self._Ap6))
 
     def betr_vegetation_soil_litter(self):
         '''vegetation-soil tranfer through litterfall'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_vegetation_soil_litter'
         D={}
         # process description starts here
         D[(3,6,procname)]=self.m.vdict[3]['bulk']*self.m.zdict[3]['bulk']\
@@ -487,240 +721,207 @@ class process():
     def betr_freshwater_ocean_runoff(self):
         ''' fresh water to ocean runoff'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_freshwater_ocean_runoff'
         D={}
         # process description starts here
+        par=self.m.par
+        vdict=self.m.vdict
         # calculate river flow from freshwater to ocean in the same cell
-        mflow=zeros(self.m.par.shape)
-        sameregid=where(self.m.flowdict[(4,5)][:,0]
-                        ==self.m.flowdict[(4,5)][:,1])[0]
-        samereg=self.m.flowdict[(4,5)][sameregid,0].astype('int')
-        mflow[samereg-1,:]=self.m.flowdict[(4,5)][sameregid,2:]
+        mflow=self._intracell_flow((4,5))
         ### ATT: BETR-Global:
         # calculate runoff from soil to ocean;
         # use max(soil_runoff, riverflow) for D-value
-        soilrunoff=self.m.par['A']*self.m.par['perc6']\
-                    *self.m.par['runoff6water']
-        oceanmask=array(self.m.vdict[5]['bulk'] > 0).astype(int)
-        freshwatermask=array(self.m.vdict[4]['bulk'] > 0).astype(int)
-        soilrunoff=soilrunoff*oceanmask*freshwatermask
+        soilrunoff=self._Ap6*par['runoff6water']
+        oceanmask=vdict[5]['bulk'] > 0
+        freshwatermask=vdict[4]['bulk'] > 0
+        soilrunoff=soilrunoff*(oceanmask & freshwatermask)
         flow=maximum(mflow, soilrunoff)
-        D[(4,5,procname)]=self.m.zdict[4]['bulk']*flow
+        D[(4,5,procname)]=self._prod((4,5,procname), self.m.zdict[4]['bulk'],
+                                     flow)
         return(D)
     
     def betr_ocean_sinkflux(self):
         ''' ocean water sinkflux (downwelling)'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_ocean_sinkflux'
         D={}
         # process description starts here
         # calculate river flow from freshwater to ocean in the same cell
-        mflow=zeros(self.m.par.shape)
-        sameregid=where(self.m.flowdict[(5,5)][:,0]
-                        ==self.m.flowdict[(5,5)][:,1])[0]
-        samereg=self.m.flowdict[(5,5)][sameregid,0].astype('int')
-        mflow[samereg-1,:]=self.m.flowdict[(5,5)][sameregid,2:]
-        D[(5,5,procname)]=self.m.zdict[5]['bulk']*mflow
+        mflow=self._intracell_flow((5,5))
+        D[(5,5,procname)]=self._prod((5,5,procname), self.m.zdict[5]['bulk'],
+                                     mflow)
         return(D)   
     
     def betr_freshwater_sediment_diff(self):
         ''' freshwater-sediment diffusion '''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_freshwater_sediment_diff'
         D={}
         # process description starts here
-        D[(4,7,procname)]=self.m.par['A']*self.m.par['perc4']\
-                           *self.m.par['diff7water']*self.m.zdict[4]['water']
+        par=self.m.par
+        D[(4,7,procname)]=self._prod((4,7,procname), self._Ap4,
+                                     par['diff7water'], self.m.zdict[4]['water'])
         D[(7,4,procname)]=D[(4,7,procname)]
         return(D)
 
     def betr_freshwater_sediment_deposit(self):
         ''' freshwater-sediment particle sedimentation '''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_freshwater_sediment_deposit'
         D={}
         # process description starts here  
         # SSchenker Note pupms into sediment ... why?
-        D[(4,7,procname)]=self.m.par['A']*self.m.par['perc4']\
-                           *self.m.par['seddep']*self.m.zdict[4]['sussed']
+        par=self.m.par
+        D[(4,7,procname)]=self._prod((4,7,procname), self._Ap4, par['seddep'],
+                                     self.m.zdict[4]['sussed'])
         return(D)
         
 
     def betr_ocean_air_resusp(self):
         ''' marine aerosol production'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_ocean_air_resusp'
         D={}
         # process description starts here              
+        par=self.m.par
         # HW added 'perc8'. Simple pot-lid assumption.
         # suppress secondary re-emission from surface compartments ? (non-default)
-        if self.m.controldict['secondarySupr'] in ['1','True','true','t','TRUE'
-                                                'T','Yes','yes','y','YES']:
-            D[(5,2,procname)]=zeros(self.m.par['A'].shape)
+        if self._suppress_secondary:
+            D[(5,2,procname)]=self._zero
         else:
-            try:
-                D[(5,2,procname)]=self.m.par['A']*self.m.par['perc5']\
-                    *(1-self.m.par['perc8'])\
-                    *self.m.par['prodaerosol5']*self.m.zdict[5]['water']
-            except ValueError:
-                D[(5,2,procname)]=self.m.par['A']*self.m.par['perc5']\
-                    *self.m.par['prodaerosol5']*self.m.zdict[5]['water']
-                            
+            D[(5,2,procname)]=self._prod((5,2,procname), self._Ap5lid,
+                                         par['prodaerosol5'],
+                                         self.m.zdict[5]['water'])
         return(D)
     
     def betr_soil_air_resusp(self):
         ''' terrestrial aerosol production'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_soil_air_resusp'
         D={}
         # process description starts here
+        par=self.m.par
         # suppress secondary re-emission from surface compartments ? (non-default)
-        if self.m.controldict['secondarySupr'] in ['1','True','true','t','TRUE'
-                                                'T','Yes','yes','y','YES']:
-            D[(6,2,procname)]=zeros(self.m.par['A'].shape)
+        if self._suppress_secondary:
+            D[(6,2,procname)]=self._zero
         else:
-            D[(6,2,procname)]=self.m.par['A']*self.m.par['perc6']\
-                           *self.m.par['resusp6']*self.m.zdict[6]['solids']
+            D[(6,2,procname)]=self._prod((6,2,procname), self._Ap6,
+                                         par['resusp6'],
+                                         self.m.zdict[6]['solids'])
         return(D)
 
     def betr_soil_veg_rootuptake(self):
         ''' soil-vegetation root uptake. The transpiration stream concentration
         factor (TSCF) is calculated according to Cousins and Mackay, 2001 [1]_.'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_soil_veg_rootuptake'
         D={}
         # process description starts here
-        TSCF = 0.784*exp(-((log10(self.m.chempardict[6]['Kow'])-1.78)**2)/2.44)
-        D[(6,3,procname)]=self.m.par['A']*self.m.par['perc6']\
-                           *self.m.par['perc3']*self.m.par['LAI']\
-                           *TSCF*self.m.par['vegwateruptake']\
-                           *self.m.zdict[6]['water']
+        par=self.m.par
+        D[(6,3,procname)]=self._prod((6,3,procname), self._Ap6p3LAI,
+                                     par['vegwateruptake'],
+                                     self.m.zdict[6]['water'], self._TSCF)
         return(D)
 
     def betr_soil_freshwater_runoff(self):
         ''' water-runoff from soil to freshwater-bodies '''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_soil_freshwater_runoff'
         D={}
         # process description starts here
-        freshwatermask=array(self.m.vdict[4]['bulk'] > 0).astype(int)
-        D[(6,4,procname)]=freshwatermask*self.m.par['A']*self.m.par['perc6']\
-                           *self.m.par['runoff6water']*self.m.zdict[6]['water']
+        par=self.m.par
+        freshwatermask=self.m.vdict[4]['bulk'] > 0
+        D[(6,4,procname)]=self._prod((6,4,procname), self._Ap6, freshwatermask,
+                                     par['runoff6water'],
+                                     self.m.zdict[6]['water'])
         return(D)
 
     def betr_soil_freshwater_erosion(self):          # HW: adapted to monthly runoff
         ''' solids-runoff from soil to freshwater-bodies'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_soil_freshwater_erosion'
         D={}
-        freshwatermask=array(self.m.vdict[4]['bulk'] > 0).astype(int)
+        par=self.m.par
+        freshwatermask=self.m.vdict[4]['bulk'] > 0
         # process description starts here
-        D[(6,4,procname)]=freshwatermask*self.m.par['A']*self.m.par['perc6']\
-                           *self.m.par['runoff6solids']\
-                           *self.m.zdict[6]['solids']
+        D[(6,4,procname)]=self._prod((6,4,procname), self._Ap6, freshwatermask,
+                                     par['runoff6solids'],
+                                     self.m.zdict[6]['solids'])
         return(D)
 
     def betr_sediment_freshwater_resusp(self):
         ''' sediment resuspension in freshwater bodies'''
         # don't change this
-        procname=inspect.getframeinfo(inspect.currentframe())[2]
+        procname='betr_sediment_freshwater_resusp'
         D={}
         # process description starts here
-        D[(7,4,procname)]=self.m.par['A']*self.m.par['perc4']\
-                           *self.m.par['sedresup']*self.m.zdict[7]['solids']
+        par=self.m.par
+        D[(7,4,procname)]=self._prod((7,4,procname), self._Ap4,
+                                     par['sedresup'], self.m.zdict[7]['solids'])
         return(D)
 
     def betr_intermittent_rain(self):
         ''' Jolliet-Hauschild [2]_ calculation of intermittent rainfall.
         Uses the simplification implemented in BETR-Global.'''
-        def _do_jolliet(wa,dwet,ddiss,twet,tdry,tsum):
-            dj1=wa*tsum/tdry
-            dj2=(dwet+ddiss)*twet/tsum
-            dj1mask=(dj1 > dj2).astype(int)
-            dj2mask=logical_not(dj1mask).astype(int)
-            ddissnew=dj1mask*ddiss*twet/tsum\
-                      +dj2mask*dj1*ddiss/dj2*twet/tsum
-            dwetnew=dj1mask*dwet*twet/tsum\
-                     +dj2mask*dj1*dwet/dj2*twet/tsum
-            return([dwetnew,ddissnew])
-            
-        ## air-veg
-        dwetairveg=copy.copy(self.D[(2,3,'betr_air2_veg_wetparticle')])
-        ddissairveg=copy.copy(self.D[(2,3,'betr_air2_veg_dissolution')])
-        mask=where((self.m.par['stdry'] != 0) & (self.m.par['stwet'] != 0)
-                   & (dwetairveg != 0) & (ddissairveg != 0))
-        tdry=self.m.par['stdry'][mask]
-        twet=self.m.par['stwet'][mask]
-        tsum=tdry+twet
-        wa=self.m.vdict[2]['bulk'][mask]*self.m.zdict[2]['bulk'][mask]\
-            *2/tdry*self.m.par['perc6'][mask]*self.m.par['perc3'][mask]\
-            *self.m.par['intercept'][mask]
-        
-        [dwetnew, ddissnew] = _do_jolliet(wa,dwetairveg[mask],
-                                          ddissairveg[mask],twet,tdry,tsum)
-        dwetairveg[mask]=dwetnew
-        ddissairveg[mask]=ddissnew
-        
-        ##air-freshwater
-        dwetairfw=copy.copy(self.D[(2,4,'betr_air2_freshwater_wetparticle')])
-        ddissairfw=copy.copy(self.D[(2,4,'betr_air2_freshwater_dissolution')])
-        mask=where((self.m.par['stdry'] != 0) & (self.m.par['stwet'] != 0)
-                   & (dwetairfw != 0) & (ddissairfw != 0))
-        tdry=self.m.par['stdry'][mask]
-        twet=self.m.par['stwet'][mask]
-        tsum=tdry+twet
-        wa=self.m.vdict[2]['bulk'][mask]*self.m.zdict[2]['bulk'][mask]\
-            *2/tdry*self.m.par['perc4'][mask]
-        
-        [dwetnew, ddissnew] = _do_jolliet(wa,dwetairfw[mask],
-                                          ddissairfw[mask],twet,tdry,tsum)
-        dwetairfw[mask]=dwetnew
-        ddissairfw[mask]=ddissnew
-
-        ##air-ocean
-        dwetairocean=copy.copy(self.D[(2,5,'betr_air2_ocean_wetparticle')])
-        ddissairocean=copy.copy(self.D[(2,5,'betr_air2_ocean_dissolution')])
-        mask=where((self.m.par['stdry'] != 0) & (self.m.par['stwet'] != 0)
-                   & (dwetairocean != 0) & (ddissairocean != 0))
-        tdry=self.m.par['stdry'][mask]
-        twet=self.m.par['stwet'][mask]
-        tsum=tdry+twet
-        wa=self.m.vdict[2]['bulk'][mask]*self.m.zdict[2]['bulk'][mask]\
-            *2/tdry*self.m.par['perc5'][mask]
-        
-        [dwetnew, ddissnew] = _do_jolliet(wa,dwetairocean[mask],
-                                          ddissairocean[mask],twet,tdry,tsum)
-        dwetairocean[mask]=dwetnew
-        ddissairocean[mask]=ddissnew
-
-        ##air-soil
-        dwetairsoil=copy.copy(self.D[(2,6,'betr_air2_soil_wetparticle')])
-        ddissairsoil=copy.copy(self.D[(2,6,'betr_air2_soil_dissolution')])
-        mask=where((self.m.par['stdry'] != 0) & (self.m.par['stwet'] != 0)
-                   & (dwetairsoil != 0) & (ddissairsoil != 0))
-        tdry=self.m.par['stdry'][mask]
-        twet=self.m.par['stwet'][mask]
-        tsum=tdry+twet
-        wa=self.m.vdict[2]['bulk'][mask]*self.m.zdict[2]['bulk'][mask]\
-            *2/tdry*self.m.par['perc6'][mask]
-        [dwetnew, ddissnew] = _do_jolliet(wa,dwetairsoil[mask],
-                                          ddissairsoil[mask],twet,tdry,tsum)
-        dwetairsoil[mask]=dwetnew
-        ddissairsoil[mask]=ddissnew
+        par=self.m.par
+        vb=self.m.vdict[2]['bulk']
+        zb=self.m.zdict[2]['bulk']
+        D=self.D
+        ## the corrected D-values are written to one (8, ...) buffer that
+        ## is reused by subsequent calls of getD
+        if self._rainbuf is None:
+            self._rainbuf=empty((len(_RAIN_KEYS),)+par.shape)
+            self._rainrows=list(self._rainbuf)
+        Dnew=self._rainrows
+        for d, k in zip(Dnew, _RAIN_KEYS):
+            copyto(d, D[k])
+        [dwetairveg, ddissairveg, dwetairfw, ddissairfw,
+         dwetairocean, ddissairocean, dwetairsoil, ddissairsoil]=Dnew
+        ## surface fractions, air volume*Z-value and the intercepting
+        ## fraction of the cell
+        [perc3, perc4, perc5, perc6]=self._percstack
+        vz2=vb*zb*2.0
+        p3i=perc3*par['intercept']
+        if _HAS_NUMBA:
+            _jolliet_sections(par['stdry'], par['stwet'], vz2, p3i,
+                              perc4, perc5, perc6,
+                              dwetairveg, ddissairveg, dwetairfw, ddissairfw,
+                              dwetairocean, ddissairocean,
+                              dwetairsoil, ddissairsoil)
+        else:
+            ## wet particle and rain dissolution D-values of air-veg,
+            ## air-freshwater, air-ocean and air-soil, stacked along the
+            ## first axis
+            dwet=self._rainbuf[0::2]
+            ddiss=self._rainbuf[1::2]
+            stdry=par['stdry']
+            stwet=par['stwet']
+            ## the correction is evaluated on the full grid; cells without
+            ## dry or wet periods or without D-values keep their values
+            mask=_rain_mask(stdry, stwet, dwet, ddiss)
+            with errstate(divide='ignore', invalid='ignore'):
+                # wa, built in place from a copy of the fractions of the
+                # cell the four sections refer to (perc6 for vegetation,
+                # perc4, perc5 and perc6), given by their rows in
+                # self._percstack
+                _P4, _P5, _P6=1, 2, 3
+                wa=self._percstack[[_P6, _P4, _P5, _P6]]
+                wa[0]*=p3i
+                wa*=divide(vz2, stdry)
+                [dwetnew, ddissnew]=_jolliet(wa, dwet, ddiss, stwet, stdry)
+            if mask.all():
+                # common case, every cell is corrected
+                copyto(dwet, dwetnew)
+                copyto(ddiss, ddissnew)
+            else:
+                copyto(dwet, dwetnew, where=mask)
+                copyto(ddiss, ddissnew, where=mask)
         ## Correction for Vegetation Interception (BETR-VBA)
-        dwetairsoil=dwetairsoil*(1-self.m.par['perc3']*self.m.par['intercept'])
-        ddissairsoil=ddissairsoil*(1-self.m.par['perc3']
-                                   *self.m.par['intercept'])
-
-        return({(2,3,'betr_air2_veg_wetparticle'):dwetairveg,
-                (2,3,'betr_air2_veg_dissolution'):ddissairveg,
-                (2,4,'betr_air2_freshwater_wetparticle'):dwetairfw,
-                (2,4,'betr_air2_freshwater_dissolution'):ddissairfw,
-                (2,5,'betr_air2_ocean_wetparticle'):dwetairocean,
-                (2,5,'betr_air2_ocean_dissolution'):ddissairocean,
-                (2,6,'betr_air2_soil_wetparticle'):dwetairsoil,
-                (2,6,'betr_air2_soil_dissolution'):ddissairsoil}
-               )
+        factor=1.0-p3i
+        dwetairsoil*=factor
+        ddissairsoil*=factor
+
+        return(dict(zip(_RAIN_KEYS, Dnew)))
 
 ################################################################################
 